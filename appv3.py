@@ -1,10 +1,17 @@
 import streamlit as st
+import os
 import re
+import json
 import sqlite3
-import pandas as pd
-import plotly.express as px
+import tempfile
 from datetime import datetime, date
 
+# NOTE: pandas & plotly are imported lazily inside the functions/pages that need them,
+# so the upload page and the published-report viewer start without paying for them.
+
+# Static report bundle (regenerated after each ingestion)
+REPORT_DIR = "reports"
+
 # --- CONFIGURATION: DISTRICT -> CENTER MAPPING ---
 DISTRICT_MAP = {
     "Patan": ["Adiya", "Melusan", "Madhutra", "Satnalpur", "Morwada"],
@@ -93,6 +100,7 @@ def parse_chat_file(file_content, district, center_name):
 
 # --- PARSING LOGIC: NAMES CSV ---
 def upload_names_csv(csv_file):
+    import pandas as pd
     df = pd.read_csv(csv_file)
     # Expected columns: "Phone", "Name"
     # Normalize headers
@@ -116,6 +124,210 @@ def upload_names_csv(csv_file):
     conn.close()
     return count, "Success"
 
+# --- DATA LOADING: LEADS + NAMES ---
+def read_leads():
+    import pandas as pd
+    conn = sqlite3.connect("bull_radar.db")
+    df = pd.read_sql_query("SELECT * FROM leads", conn)
+    names_df = pd.read_sql_query("SELECT * FROM names_map", conn)
+    conn.close()
+
+    if not df.empty:
+        df['date_time'] = pd.to_datetime(df['date_time'])
+        df['date_only'] = df['date_time'].dt.date
+
+        # MERGE: Replace 'added_by' number with Name if it exists
+        if not names_df.empty:
+            # We treat 'phone_number' in names_map as the join key
+            # Standardize format if needed (remove spaces, etc in future)
+            mapping_dict = dict(zip(names_df.phone_number, names_df.name))
+            df['added_by_name'] = df['added_by'].map(mapping_dict).fillna(df['added_by'])
+        else:
+            df['added_by_name'] = df['added_by']
+    return df
+
+@st.cache_data(show_spinner=False)
+def load_leads():
+    # Cached copy for the Dashboard; st.cache_data.clear() runs after every ingestion
+    return read_leads()
+
+def count_leads():
+    conn = sqlite3.connect("bull_radar.db")
+    count = conn.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
+    conn.close()
+    return count
+
+# --- ANALYTICS: KPIs & CHARTS (shared by Dashboard and Published Reports) ---
+def compute_kpis(df):
+    kpis = {
+        "total": len(df),
+        "organic": int((df['source_type'] == "Organic (Link)").sum()),
+        "manual": int((df['source_type'] == "Manual Add").sum()),
+        "peak_day": None,
+    }
+    if not df.empty:
+        kpis["peak_day"] = str(df['date_only'].value_counts().idxmax())
+    return kpis
+
+def build_views(df):
+    import plotly.express as px
+
+    # Organic vs Manual trend
+    timeline = df.groupby(['date_only', 'source_type']).size().reset_index(name='Count')
+    fig_time = px.line(timeline, x='date_only', y='Count', color='source_type',
+                       markers=True, color_discrete_sequence=['#2ecc71', '#e74c3c'])
+    fig_time.update_layout(xaxis_title="Date", yaxis_title="Farmers Joined")
+
+    # Center performance
+    center_perf = df.groupby('center_name')['source_type'].value_counts().unstack().fillna(0)
+    fig_bar = px.bar(center_perf, barmode='stack',
+                     color_discrete_sequence=['#e74c3c', '#2ecc71']) # Manual=Red, Organic=Green (Auto mapped)
+
+    # Supervisor leaderboard (group by NAME instead of number)
+    manual_df = df[df['source_type'] == "Manual Add"]
+    sup_stats, fig_sup = None, None
+    if not manual_df.empty:
+        sup_stats = manual_df.groupby(['added_by_name', 'center_name']).size().reset_index(name='Farmers Added')
+        sup_stats = sup_stats.sort_values(by='Farmers Added', ascending=False).head(15)
+
+        fig_sup = px.bar(sup_stats, x='Farmers Added', y='added_by_name', color='center_name',
+                         orientation='h', title="Top 15 Supervisors", text_auto=True)
+        fig_sup.update_layout(yaxis_title="Supervisor Name")
+
+    return {
+        "timeline": timeline, "fig_time": fig_time,
+        "center_perf": center_perf, "fig_bar": fig_bar,
+        "manual_df": manual_df, "sup_stats": sup_stats, "fig_sup": fig_sup,
+    }
+
+@st.cache_data(show_spinner=False)
+def dashboard_views(start_date, end_date, district, center):
+    # Memoized per filter combination, so reruns don't rebuild every figure
+    df = load_leads()
+    if start_date and end_date:
+        df = df[(df['date_only'] >= start_date) & (df['date_only'] <= end_date)]
+    if district != "All":
+        df = df[df['district'] == district]
+    if center != "All":
+        df = df[df['center_name'] == center]
+    return compute_kpis(df), build_views(df)
+
+# --- PUBLISH REPORT: STATIC HTML/JSON BUNDLE PER DISTRICT ---
+def _records(table):
+    # Round-trip through pandas' JSON writer so numpy ints / dates become plain JSON values
+    if 'date_only' in table.columns:
+        table = table.assign(date_only=table['date_only'].astype(str))
+    return json.loads(table.to_json(orient="records"))
+
+def _report_html(district, kpis, views, generated_at, plotlyjs_name):
+    from html import escape
+    charts = [
+        ("📈 Organic vs Manual Trend", views["fig_time"]),
+        ("📍 Center Performance", views["fig_bar"]),
+        ("🏆 Top Supervisors (Manual Additions)", views["fig_sup"]),
+    ]
+    sections = ""
+    plotlyjs = plotlyjs_name # first chart loads the shared plotly.js file next to this report
+    for title, fig in charts:
+        if fig is not None:
+            body = fig.to_html(full_html=False, include_plotlyjs=plotlyjs)
+            plotlyjs = False
+        else:
+            body = "<p>No manual additions for this district.</p>"
+        sections += f"<h2>{title}</h2>\n{body}\n"
+
+    cards = "".join(
+        f'<div class="kpi"><span>{label}</span><b>{escape(str(value))}</b></div>'
+        for label, value in [("Total Farmers", kpis["total"]), ("Organic Joins", kpis["organic"]),
+                             ("Manual Adds", kpis["manual"]), ("Peak Growth Day", kpis["peak_day"] or "-")]
+    )
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Bull Radar - {escape(district)}</title>
+<style>
+body {{ font-family: sans-serif; margin: 12px; color: #2C3E50; }}
+.kpis {{ display: flex; flex-wrap: wrap; gap: 8px; }}
+.kpi {{ background-color: #F0F2F6; padding: 15px; border-radius: 10px; flex: 1 1 140px; }}
+.kpi span {{ display: block; font-size: 0.85em; }}
+.kpi b {{ font-size: 1.6em; }}
+</style></head>
+<body>
+<h1>📊 Bull Radar - {escape(district)}</h1>
+<p><small>Generated {escape(generated_at)}</small></p>
+<div class="kpis">{cards}</div>
+{sections}</body></html>
+"""
+
+def _write_atomic(path, text):
+    # Write to a temp file and swap it in, so readers never see a half-written report
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _ensure_plotlyjs():
+    # Ship plotly.js once in REPORT_DIR (named by version) so reports work offline
+    from plotly.offline import get_plotlyjs, get_plotlyjs_version
+    name = f"plotly-{get_plotlyjs_version()}.min.js"
+    path = os.path.join(REPORT_DIR, name)
+    if not os.path.exists(path):
+        _write_atomic(path, get_plotlyjs())
+    return name
+
+def publish_report(districts=None):
+    # districts=None rebuilds every district; otherwise only those are refreshed in the index
+    df = read_leads()
+    if districts is not None and not df.empty:
+        df = df[df['district'].isin(districts)]
+    if df.empty:
+        return []
+
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    plotlyjs_name = _ensure_plotlyjs()
+    generated_at = datetime.now().strftime("%Y-%m-%d %H:%M")
+    index = {}
+    if districts is not None:
+        existing = load_published_index() or {}
+        index = {entry["district"]: entry for entry in existing.get("districts", [])}
+
+    published = []
+    for district, d_df in df.groupby('district'):
+        kpis = compute_kpis(d_df)
+        views = build_views(d_df)
+        slug = re.sub(r"\W+", "_", district).strip("_").lower()
+
+        bundle = {
+            "district": district,
+            "generated_at": generated_at,
+            "kpis": kpis,
+            "trend": _records(views["timeline"]),
+            "center_performance": _records(views["center_perf"].astype(int).reset_index()),
+            "supervisor_leaderboard": _records(views["sup_stats"]) if views["sup_stats"] is not None else [],
+        }
+        _write_atomic(os.path.join(REPORT_DIR, f"{slug}.json"),
+                      json.dumps(bundle, ensure_ascii=False, indent=2))
+        _write_atomic(os.path.join(REPORT_DIR, f"{slug}.html"),
+                      _report_html(district, kpis, views, generated_at, plotlyjs_name))
+        index[district] = {"district": district, "slug": slug, "generated_at": generated_at, "kpis": kpis}
+        published.append(district)
+
+    _write_atomic(os.path.join(REPORT_DIR, "index.json"),
+                  json.dumps({"generated_at": generated_at, "districts": list(index.values())},
+                             ensure_ascii=False, indent=2))
+    return published
+
+def load_published_index():
+    try:
+        with open(os.path.join(REPORT_DIR, "index.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
 # --- MAIN APP UI ---
 st.set_page_config(page_title="Bull Radar", layout="wide", initial_sidebar_state="expanded")
 
@@ -133,7 +345,8 @@ init_db()
 # SIDEBAR NAVIGATION
 st.sidebar.image("https://cdn-icons-png.flaticon.com/512/2504/2504936.png", width=50) # Placeholder Icon
 st.sidebar.title("Bull Radar 🎯")
-page = st.sidebar.radio("Navigation", ["Dashboard", "Upload Chat Data", "Map Names (Settings)"])
+# "Published Reports" is the default landing page: it only reads the JSON bundle
+page = st.sidebar.radio("Navigation", ["Published Reports", "Dashboard", "Upload Chat Data", "Map Names (Settings)"])
 
 # --- PAGE 1: UPLOAD CHAT DATA ---
 if page == "Upload Chat Data":
@@ -151,11 +364,20 @@ if page == "Upload Chat Data":
             count = parse_chat_file(content, s_district, s_center)
         if count > 0:
             st.success(f"✅ Captured {count} new leads for **{s_center}**")
+            st.cache_data.clear()
+            try:
+                with st.spinner("Publishing report..."):
+                    published = publish_report([s_district])
+                st.caption(f"📤 Published static report for: {', '.join(published)}")
+            except Exception as e:
+                st.warning(f"⚠️ Data was saved, but publishing the report failed: {e}")
         else:
             st.warning("⚠️ No new data found.")
 
 # --- PAGE 2: MAP NAMES ---
 elif page == "Map Names (Settings)":
+    import pandas as pd
+
     st.header("👤 Supervisor Name Mapping")
     st.info("Upload a CSV with two columns: `Phone` and `Name`. This will replace numbers with names in the dashboard.")
     
@@ -164,8 +386,27 @@ elif page == "Map Names (Settings)":
         count, msg = upload_names_csv(name_file)
         if count > 0:
             st.success(f"✅ Successfully mapped {count} phone numbers to names!")
+            st.cache_data.clear()
+            # Names change every district's leaderboard; publish once per uploaded file
+            names_key = (name_file.name, name_file.size)
+            if st.session_state.get("published_names_file") != names_key:
+                try:
+                    with st.spinner("Publishing reports..."):
+                        published = publish_report()
+                    st.session_state["published_names_file"] = names_key
+                    st.caption(f"📤 Published static reports for: {', '.join(published) or 'none'}")
+                except Exception as e:
+                    st.warning(f"⚠️ Names were saved, but publishing the reports failed: {e}")
         else:
             st.error(msg)
+
+    if st.button("Re-publish Reports"):
+        try:
+            with st.spinner("Publishing reports..."):
+                published = publish_report()
+            st.caption(f"📤 Published static reports for: {', '.join(published) or 'none'}")
+        except Exception as e:
+            st.warning(f"⚠️ Publishing reports failed: {e}")
             
     # Show current mappings
     conn = sqlite3.connect("bull_radar.db")
@@ -175,29 +416,74 @@ elif page == "Map Names (Settings)":
         st.subheader("Current Mappings")
         st.dataframe(mapping_df, hide_index=True)
 
-# --- PAGE 3: DASHBOARD ---
+# --- PAGE 3: PUBLISHED REPORTS (reads the JSON bundle only) ---
+elif page == "Published Reports":
+    st.title("📤 Published Reports")
+    report_index = load_published_index()
+
+    # First run on an existing DB: publish once so the page isn't empty
+    if report_index is None and count_leads() > 0:
+        try:
+            with st.spinner("Publishing reports for existing data..."):
+                publish_report()
+            report_index = load_published_index()
+        except Exception as e:
+            st.warning(f"⚠️ Publishing reports failed: {e}")
+
+    if report_index and report_index["districts"]:
+        entries = {entry["district"]: entry for entry in report_index["districts"]}
+        sel_report = st.selectbox("District", list(entries.keys()))
+        entry = entries[sel_report]
+        st.caption(f"Last published: {entry.get('generated_at', report_index['generated_at'])}")
+
+        kpi1, kpi2, kpi3, kpi4 = st.columns(4)
+        kpi1.metric("Total Farmers", entry["kpis"]["total"])
+        kpi2.metric("Organic Joins", entry["kpis"]["organic"])
+        kpi3.metric("Manual Adds", entry["kpis"]["manual"])
+        kpi4.metric("Peak Growth Day", entry["kpis"]["peak_day"] or "-")
+
+        html_path = os.path.join(REPORT_DIR, f"{entry['slug']}.html")
+        json_path = os.path.join(REPORT_DIR, f"{entry['slug']}.json")
+        if os.path.exists(html_path) and os.path.exists(json_path):
+            with open(json_path, encoding="utf-8") as f:
+                bundle = json.load(f)
+
+            st.divider()
+            col_left, col_right = st.columns(2)
+            with col_left:
+                st.subheader("📈 Organic vs Manual Trend")
+                st.line_chart(bundle["trend"], x="date_only", y="Count", color="source_type")
+            with col_right:
+                st.subheader("📍 Center Performance")
+                st.bar_chart(bundle["center_performance"], x="center_name")
+
+            st.subheader("🏆 Top Supervisors (Manual Additions)")
+            if bundle["supervisor_leaderboard"]:
+                st.dataframe(bundle["supervisor_leaderboard"], hide_index=True, use_container_width=True)
+            else:
+                st.info("No manual additions for this district.")
+
+            st.divider()
+            col_html, col_json = st.columns(2)
+            with open(html_path, "rb") as f:
+                col_html.download_button("⬇️ Download HTML Report", f.read(),
+                                         file_name=f"bull_radar_{entry['slug']}.html", mime="text/html")
+            with open(json_path, "rb") as f:
+                col_json.download_button("⬇️ Download JSON Data", f.read(),
+                                         file_name=f"bull_radar_{entry['slug']}.json", mime="application/json")
+        else:
+            st.warning("⚠️ Report files for this district are missing. Use 'Re-publish Reports' on the Map Names page.")
+    else:
+        st.info("No reports published yet. Upload chat data, or use 'Re-publish Reports' on the Map Names page.")
+
+# --- PAGE 4: DASHBOARD ---
 elif page == "Dashboard":
     st.title("📊 Bull Radar Analytics")
     
     # 1. LOAD DATA & MERGE NAMES
-    conn = sqlite3.connect("bull_radar.db")
-    df = pd.read_sql_query("SELECT * FROM leads", conn)
-    names_df = pd.read_sql_query("SELECT * FROM names_map", conn)
-    conn.close()
+    df = load_leads()
     
     if not df.empty:
-        df['date_time'] = pd.to_datetime(df['date_time'])
-        df['date_only'] = df['date_time'].dt.date
-
-        # MERGE: Replace 'added_by' number with Name if it exists
-        if not names_df.empty:
-            # We treat 'phone_number' in names_map as the join key
-            # Standardize format if needed (remove spaces, etc in future)
-            mapping_dict = dict(zip(names_df.phone_number, names_df.name))
-            df['added_by_name'] = df['added_by'].map(mapping_dict).fillna(df['added_by'])
-        else:
-            df['added_by_name'] = df['added_by']
-
         # --- FILTERS SIDEBAR ---
         st.sidebar.divider()
         st.sidebar.header("🔍 Filters")
@@ -210,6 +496,8 @@ elif page == "Dashboard":
         if len(date_range) == 2:
             start_date, end_date = date_range
             df = df[(df['date_only'] >= start_date) & (df['date_only'] <= end_date)]
+        else:
+            start_date, end_date = None, None
         
         # LOCATION FILTERS
         sel_dist = st.sidebar.selectbox("Filter District", ["All"] + list(df['district'].unique()))
@@ -220,16 +508,17 @@ elif page == "Dashboard":
         if sel_cent != "All":
             df = df[df['center_name'] == sel_cent]
 
+        kpis, views = dashboard_views(start_date, end_date, sel_dist, sel_cent)
+
         # --- KPI ROW ---
         kpi1, kpi2, kpi3, kpi4 = st.columns(4)
-        kpi1.metric("Total Farmers", len(df))
-        kpi2.metric("Organic Joins", len(df[df['source_type'] == "Organic (Link)"]))
-        kpi3.metric("Manual Adds", len(df[df['source_type'] == "Manual Add"]))
+        kpi1.metric("Total Farmers", kpis["total"])
+        kpi2.metric("Organic Joins", kpis["organic"])
+        kpi3.metric("Manual Adds", kpis["manual"])
         
         # Calculate Top Day
-        if not df.empty:
-            top_day = df['date_only'].value_counts().idxmax()
-            kpi4.metric("Peak Growth Day", str(top_day))
+        if kpis["peak_day"]:
+            kpi4.metric("Peak Growth Day", kpis["peak_day"])
 
         st.divider()
 
@@ -238,34 +527,20 @@ elif page == "Dashboard":
         
         with col_left:
             st.subheader("📈 Organic vs Manual Trend")
-            timeline = df.groupby(['date_only', 'source_type']).size().reset_index(name='Count')
-            fig_time = px.line(timeline, x='date_only', y='Count', color='source_type', 
-                               markers=True, color_discrete_sequence=['#2ecc71', '#e74c3c'])
-            fig_time.update_layout(xaxis_title="Date", yaxis_title="Farmers Joined")
-            st.plotly_chart(fig_time, use_container_width=True)
+            st.plotly_chart(views["fig_time"], use_container_width=True)
             
         with col_right:
             st.subheader("📍 Center Performance")
-            center_perf = df.groupby('center_name')['source_type'].value_counts().unstack().fillna(0)
-            fig_bar = px.bar(center_perf, barmode='stack', 
-                             color_discrete_sequence=['#e74c3c', '#2ecc71']) # Manual=Red, Organic=Green (Auto mapped)
-            st.plotly_chart(fig_bar, use_container_width=True)
+            st.plotly_chart(views["fig_bar"], use_container_width=True)
 
         st.divider()
 
         # --- SUPERVISOR LEADERBOARD (WITH NAMES) ---
         st.subheader("🏆 Top Supervisors (Manual Additions)")
         
-        manual_df = df[df['source_type'] == "Manual Add"]
-        if not manual_df.empty:
-            # Group by NAME instead of number
-            sup_stats = manual_df.groupby(['added_by_name', 'center_name']).size().reset_index(name='Farmers Added')
-            sup_stats = sup_stats.sort_values(by='Farmers Added', ascending=False).head(15)
-            
-            fig_sup = px.bar(sup_stats, x='Farmers Added', y='added_by_name', color='center_name', 
-                             orientation='h', title="Top 15 Supervisors", text_auto=True)
-            fig_sup.update_layout(yaxis_title="Supervisor Name")
-            st.plotly_chart(fig_sup, use_container_width=True)
+        manual_df = views["manual_df"]
+        if views["fig_sup"] is not None:
+            st.plotly_chart(views["fig_sup"], use_container_width=True)
             
             with st.expander("View Detailed Data Table"):
                 st.dataframe(manual_df[['date_time', 'phone_number', 'added_by_name', 'center_name', 'raw_text']], use_container_width=True)
@@ -273,4 +548,4 @@ elif page == "Dashboard":
             st.info("No manual additions in this filtered view.")
 
     else:
-        st.info("👋 Welcome to Bull Radar! Go to 'Upload Chat Data' to import your first file.")
\ No newline at end of file
+        st.info("👋 Welcome to Bull Radar! Go to 'Upload Chat Data' to import your first file.")
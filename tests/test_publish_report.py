@@ -0,0 +1,127 @@
+import importlib.util
+import json
+import os
+import sqlite3
+
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("plotly")
+pytest.importorskip("streamlit")
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "appv3.py")
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # appv3 uses a relative "bull_radar.db", so run it from an empty temp dir
+    monkeypatch.chdir(tmp_path)
+    spec = importlib.util.spec_from_file_location("appv3", APP_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    monkeypatch.setattr(module, "REPORT_DIR", str(tmp_path / "reports"))
+    return module
+
+
+def seed(rows):
+    conn = sqlite3.connect("bull_radar.db")
+    conn.executemany("INSERT INTO leads VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                     [(f"id{i}",) + row for i, row in enumerate(rows)])
+    conn.commit()
+    conn.close()
+
+
+def read_json(app, name):
+    with open(os.path.join(app.REPORT_DIR, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_publish_report_bundle_shape(app):
+    seed([
+        ("2024-01-01 10:00:00", "111", "Organic (Link)", "Self", "Patan", "Adiya", "l1"),
+        ("2024-01-01 11:00:00", "222", "Manual Add", "999", "Patan", "Adiya", "l2"),
+        ("2024-01-02 09:00:00", "333", "Manual Add", "999", "Patan", "Melusan", "l3"),
+        ("2024-01-03 09:00:00", "444", "Organic (Link)", "Self", "Kutch", "Adesar", "l4"),
+        ("2024-01-03 10:00:00", "555", "Organic (Link)", "Self", "Kutch", "Adesar", "l5"),
+    ])
+
+    assert sorted(app.publish_report()) == ["Kutch", "Patan"]
+
+    index = read_json(app, "index.json")
+    assert set(index) == {"generated_at", "districts"}
+    entries = {e["district"]: e for e in index["districts"]}
+    assert set(entries) == {"Kutch", "Patan"}
+    assert entries["Patan"]["kpis"] == {"total": 3, "organic": 1, "manual": 2, "peak_day": "2024-01-01"}
+
+    patan = read_json(app, "patan.json")
+    assert set(patan) == {"district", "generated_at", "kpis", "trend",
+                          "center_performance", "supervisor_leaderboard"}
+    assert sum(r["Count"] for r in patan["trend"]) == 3
+    assert {r["date_only"] for r in patan["trend"]} == {"2024-01-01", "2024-01-02"}
+    centers = {r["center_name"]: r for r in patan["center_performance"]}
+    assert centers["Adiya"] == {"center_name": "Adiya", "Manual Add": 1, "Organic (Link)": 1}
+    assert centers["Melusan"]["Organic (Link)"] == 0
+    assert {r["center_name"] for r in patan["supervisor_leaderboard"]} == {"Adiya", "Melusan"}
+    assert sum(r["Farmers Added"] for r in patan["supervisor_leaderboard"]) == 2
+    assert os.path.exists(os.path.join(app.REPORT_DIR, "patan.html"))
+
+    # Organic-only district: no leaderboard figure, empty list in the bundle
+    kutch = read_json(app, "kutch.json")
+    assert kutch["kpis"]["manual"] == 0
+    assert kutch["supervisor_leaderboard"] == []
+    assert kutch["center_performance"] == [{"center_name": "Adesar", "Organic (Link)": 2}]
+    assert "No manual additions" in open(os.path.join(app.REPORT_DIR, "kutch.html"), encoding="utf-8").read()
+
+
+def test_publish_single_district_merges_index(app):
+    seed([
+        ("2024-01-01 10:00:00", "111", "Organic (Link)", "Self", "Patan", "Adiya", "l1"),
+        ("2024-01-03 09:00:00", "444", "Organic (Link)", "Self", "Kutch", "Adesar", "l4"),
+    ])
+    app.publish_report()
+    seed_extra = ("2024-01-04 09:00:00", "666", "Manual Add", "999", "Kutch", "Balasar", "l6")
+    conn = sqlite3.connect("bull_radar.db")
+    conn.execute("INSERT INTO leads VALUES (?, ?, ?, ?, ?, ?, ?, ?)", ("extra",) + seed_extra)
+    conn.commit()
+    conn.close()
+
+    assert app.publish_report(["Kutch"]) == ["Kutch"]
+
+    entries = {e["district"]: e for e in read_json(app, "index.json")["districts"]}
+    assert set(entries) == {"Kutch", "Patan"}
+    assert entries["Kutch"]["kpis"]["total"] == 2
+    assert entries["Patan"]["kpis"]["total"] == 1
+    assert not [f for f in os.listdir(app.REPORT_DIR) if f.endswith(".tmp")]
+
+
+def test_publish_ships_local_plotlyjs(app):
+    seed([("2024-01-01 10:00:00", "111", "Organic (Link)", "Self", "Patan", "Adiya", "l1")])
+    app.publish_report()
+
+    scripts = [f for f in os.listdir(app.REPORT_DIR) if f.startswith("plotly-") and f.endswith(".min.js")]
+    assert len(scripts) == 1
+    html = open(os.path.join(app.REPORT_DIR, "patan.html"), encoding="utf-8").read()
+    assert f'src="{scripts[0]}"' in html
+    assert "cdn.plot.ly" not in html
+
+
+def test_landing_page_publishes_existing_data(tmp_path, monkeypatch):
+    from streamlit.testing.v1 import AppTest
+
+    monkeypatch.chdir(tmp_path)
+    conn = sqlite3.connect("bull_radar.db")
+    conn.close()
+    at = AppTest.from_file(APP_PATH)
+    at.run()
+    # init_db() has run; add data that predates any published report
+    seed([
+        ("2024-01-01 10:00:00", "111", "Organic (Link)", "Self", "Patan", "Adiya", "l1"),
+        ("2024-01-01 11:00:00", "222", "Manual Add", "999", "Patan", "Adiya", "l2"),
+    ])
+    at.run()
+
+    assert not at.exception
+    assert at.sidebar.radio[0].value == "Published Reports"
+    assert os.path.exists(os.path.join("reports", "index.json"))
+    assert [m.value for m in at.metric][:3] == ["2", "1", "1"]
+    assert len(at.dataframe) == 1